@@ -1,6 +1,6 @@
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
-import json
+import orjson
 from openai.types.chat.chat_completion_message_param import ChatCompletionMessageParam
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
@@ -110,7 +110,7 @@ def convert_to_openai_messages(
                         "type": "function",
                         "function": {
                             "name": toolInvocation.toolName,
-                            "arguments": json.dumps(toolInvocation.args),
+                            "arguments": orjson.dumps(toolInvocation.args).decode(),
                         },
                     }
                 )
@@ -132,7 +132,7 @@ def convert_to_openai_messages(
                 tool_message = {
                     "role": "tool",
                     "tool_call_id": toolInvocation.toolCallId,
-                    "content": json.dumps(toolInvocation.result),
+                    "content": orjson.dumps(toolInvocation.result).decode(),
                 }
 
                 openai_messages.append(tool_message)
@@ -213,7 +213,7 @@ async def create_message(
             detail="No user message found",
         )
 
-    response = ChatService.generate_response(
+    response = await ChatService.generate_response(
         db, conversation_id, latest_message.content
     )
 
@@ -254,7 +254,7 @@ async def create_message_stream(
     # Stream the response
     response = StreamingResponse(ChatService.generate_response_stream(
         db, conversation_id, messages
-    ))
+    ), media_type="text/plain; charset=utf-8")
 
     response.headers['x-vercel-ai-data-stream'] = 'v1'
 
@@ -308,13 +308,13 @@ def add_tool_result(
 
 from services.rag import RAGService
 @router.post("/test-retrieval")
-def test_retrieval(
+async def test_retrieval(
     query: str, db: Session = Depends(get_db)
 ):
     """Test retrieval with a query"""
 
     # Perform retrieval
-    context = RAGService.retrieve_relevant_context(db, query)
+    context = await RAGService.aretrieve_relevant_context(db, query)
     print(f"{context=}")
 
     return {"context": context}
\ No newline at end of file
@@ -6,6 +6,7 @@ from pydantic import BaseModel, Field
 from core.database import get_db
 from repositories.knowledge_base import DocumentRepository
 from services.rag import RAGService
+from tools.get_information import clear_result_cache
 
 router = APIRouter()
 
@@ -61,6 +62,9 @@ def create_document(document: DocumentCreate, db: Session = Depends(get_db)):
     # Index the document for RAG
     RAGService.index_document(db, doc.id, doc.content)
 
+    # Cached retrieval results do not include the new document yet
+    clear_result_cache()
+
     return {
         "id": doc.id,
         "title": doc.title,
@@ -145,6 +149,9 @@ def update_document(document_id: int, document: DocumentUpdate, db: Session = De
     if document.content is not None:
         RAGService.index_document(db, document_id, updated_document.content)
 
+    # Cached retrieval results may hold the old content or source details
+    clear_result_cache()
+
     return {
         "id": updated_document.id,
         "title": updated_document.title,
@@ -165,4 +172,7 @@ def delete_document(document_id: int, db: Session = Depends(get_db)):
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Document {document_id} not found"
         )
+
+    # Cached retrieval results may still reference the deleted document
+    clear_result_cache()
     return None
@@ -1,13 +1,14 @@
 import uvicorn
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import logging
 
 from core.config import settings
 from core.database import Base, engine
 from api import api_router
-from utils.logger import setup_logger
+from services.llm import llm_service, close_http_clients
+from utils.logger import setup_logger, stop_log_listeners
 
 # Set up logger
 logger = setup_logger("chatbot_service")
@@ -22,6 +23,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_PREFIX}/openapi.json",
     docs_url=f"{settings.API_PREFIX}/docs",
     redoc_url=f"{settings.API_PREFIX}/redoc",
+    default_response_class=ORJSONResponse,
 )
 
 # Add CORS middleware
@@ -37,7 +39,7 @@ app.add_middleware(
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"detail": "An unexpected error occurred."}
     )
@@ -56,10 +58,18 @@ async def startup_event():
     logger.info("Starting chatbot service")
     create_tables()
 
+    # Pre-warm LLM provider connections so the first request skips the handshakes
+    try:
+        await llm_service.warm_up()
+    except Exception as e:
+        logger.warning(f"LLM connection warm-up failed: {e}")
+
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down chatbot service")
+    await close_http_clients()
+    stop_log_listeners()
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
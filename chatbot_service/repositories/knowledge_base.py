@@ -1,6 +1,6 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.orm import Session
-from sqlalchemy import text
+from sqlalchemy import text, insert, Row
 from sqlalchemy.sql.expression import func
 
 from models.knowledge_base import Document, DocumentChunk
@@ -72,6 +72,21 @@ class DocumentChunkRepository:
         db.refresh(chunk)
         return chunk
 
+    @staticmethod
+    def create_chunks(db: Session, document_id: int, contents: List[str],
+                      embeddings: List[List[float]], first_chunk_number: int = 0) -> None:
+        """Create several document chunks with embeddings in a single multi-row insert"""
+        db.execute(insert(DocumentChunk), [
+            {
+                "document_id": document_id,
+                "content": content,
+                "chunk_number": first_chunk_number + i,
+                "embedding": embedding
+            }
+            for i, (content, embedding) in enumerate(zip(contents, embeddings))
+        ])
+        db.commit()
+
     @staticmethod
     def get_chunk_by_id(db: Session, chunk_id: int) -> Optional[DocumentChunk]:
         """Get a document chunk by its ID"""
@@ -91,12 +106,13 @@ class DocumentChunkRepository:
         return True
 
     @staticmethod
-    def search_similar_chunks(db: Session, query_embedding: List[float], limit: int = 5) -> List[DocumentChunk]:
+    def search_similar_chunks(db: Session, query_embedding: List[float], limit: int = 5) -> List[Row]:
         """
         Search for similar document chunks using vector similarity
-        Uses cosine similarity with pgvector
+        Uses L2 distance with pgvector and returns lightweight rows
+        (id, document_id, content, chunk_number) rather than ORM objects
         """
-        # SQL query using pgvector's cosine similarity operator
+        # SQL query using pgvector's L2 distance operator
         stmt = text("""
             SELECT id, document_id, content, chunk_number
             FROM document_chunks
@@ -110,14 +126,23 @@ class DocumentChunkRepository:
             "limit": limit
         })
 
-        # Convert result to DocumentChunk objects
-        chunks = []
-        for row in result:
-            chunk = DocumentChunk(
-                id=row.id,
-                document_id=row.document_id,
-                content=row.content,
-                chunk_number=row.chunk_number
-            )
-            chunks.append(chunk)
-        return chunks
+        # Rows expose the same attributes as DocumentChunk for the selected columns
+        return result.all()
+
+    @staticmethod
+    def search_similar_chunks_with_documents(db: Session, query_embedding: List[float],
+                                             limit: int = 5) -> List[Row]:
+        """
+        Search for similar document chunks together with their parent documents
+        Uses the same pgvector distance as search_similar_chunks, in a single joined query,
+        and returns lightweight rows (content, id, title, source) where id, title and
+        source belong to the chunk's document
+        """
+        return (
+            # Select only the columns callers read, so no ORM entities are built
+            db.query(DocumentChunk.content, Document.id, Document.title, Document.source)
+            .join(Document, DocumentChunk.document_id == Document.id)
+            .order_by(DocumentChunk.embedding.l2_distance(query_embedding))
+            .limit(limit)
+            .all()
+        )
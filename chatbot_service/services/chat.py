@@ -144,7 +144,7 @@ class ChatService:
         }
 
     @staticmethod
-    def generate_response(
+    async def generate_response(
         db: Session, conversation_id: int, query: str
     ) -> Dict[str, Any]:
         """
@@ -172,11 +172,11 @@ class ChatService:
         ]
 
         # Retrieve relevant context using RAG
-        # context = RAGService.retrieve_relevant_context(db, query)
+        # context = await RAGService.aretrieve_relevant_context(db, query)
         context = ""
 
         # Generate response from LLM with context
-        llm_response = llm_service.generate_response(formatted_messages, context)
+        llm_response = await llm_service.generate_response(formatted_messages, context)
         tool_calls, tool_results = [], []
         for conversation_turn in llm_response["conversation_turns"]:
             tool_calls.extend(conversation_turn.get("tool_calls", []))
@@ -219,19 +219,20 @@ class ChatService:
         # Retrieve relevant context using RAG
         # context = RAGService.retrieve_relevant_context(db, query)
 
+        # Pass stream_state=new_stream_state() to collect the streamed content and tool calls
         llm_response = llm_service.generate_response_stream(messages)
 
 
         # Get the full content from the final chunks to save in the database
-        # final_content = await llm_service.get_final_streaming_content()
+        # final_content = await llm_service.get_final_streaming_content(stream_state)
 
         # Store the complete message in the database
         # assistant_message = ChatService.add_assistant_message(
         #     db,
         #     conversation_id,
         #     final_content,
-        #     llm_service.current_stream_tool_calls,
-        #     llm_service.current_stream_tool_results,
+        #     stream_state["tool_calls"],
+        #     stream_state["tool_results"],
         # )
 
         return llm_response
\ No newline at end of file
@@ -4,6 +4,9 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 
 from core.config import settings
+from utils.cache import TTLCache, normalize_query
+
+QUERY_EMBEDDING_CACHE_SIZE = 4096  # Maximum number of query embeddings kept in memory
 
 class EmbeddingService:
     """Service for creating text embeddings"""
@@ -24,11 +27,32 @@ class EmbeddingService:
             )
         else:
             raise ValueError(f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
+
+        # Query embeddings keyed by normalized query
+        self._query_embedding_cache = TTLCache(QUERY_EMBEDDING_CACHE_SIZE)
     
     def create_embedding(self, text: str) -> List[float]:
         """Create embedding for a single text"""
         return self.embedding_model.embed_query(text)
     
+    def create_query_embedding(self, query: str) -> List[float]:
+        """
+        Create embedding for a search query, reusing the embedding of an equivalent earlier query
+
+        Only the cache key is normalized: queries differing in case or whitespace share
+        an entry, but a miss always embeds the query exactly as the user wrote it.
+        """
+        key = normalize_query(query)
+        cached = self._query_embedding_cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        # Tuples keep cached entries immutable
+        embedding = tuple(self.embedding_model.embed_query(query))
+        self._query_embedding_cache.set(key, embedding)
+
+        return list(embedding)
+
     def create_embeddings(self, texts: List[str]) -> List[List[float]]:
         """Create embeddings for multiple texts"""
         return self.embedding_model.embed_documents(texts)
@@ -1,14 +1,248 @@
-from typing import List, Dict, Any, Optional, Union, AsyncIterator
-import json
-from openai import OpenAI, AsyncOpenAI
+from typing import List, Dict, Any, Optional, Union, AsyncIterator, Callable, Iterator, Sequence
+from collections.abc import Mapping, Sequence as SequenceABC, Set
+from decimal import Decimal
+from itertools import chain
+import asyncio
+import hashlib
+import inspect
+import time
+from functools import lru_cache
+from types import MappingProxyType
+import httpx
+import orjson
+from openai import AsyncOpenAI
 import google.generativeai as genai
-from utils import function_to_schema
+from utils import function_to_schema, TTLCache
 from tools import get_weather, get_current_location, get_information
 
 from core.config import settings
 
 
 MAX_TOOL_CALLS = 5  # Maximum number of tool calls allowed in a single response
+MAX_CONCURRENT_TOOL_CALLS = 8  # Maximum number of blocking tool calls running in worker threads
+
+# Generation settings shared by every Gemini request
+GEMINI_GENERATION_CONFIG = MappingProxyType({
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "top_k": 40,
+    "max_output_tokens": 1024,
+})
+
+# Connection pooling shared by the OpenAI client in the process
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=32)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+_ASYNC_HTTP_CLIENT = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+STREAM_QUEUE_SIZE = 64  # Maximum number of pending events between a stream producer and consumer
+
+STREAM_COALESCE_CHARS = 64  # Flush buffered text once it reaches this many characters
+STREAM_COALESCE_SECONDS = 0.016  # ... or at most this long after the last flush (one frame at 60 Hz)
+
+# Tools exposed to the LLM; the schema is introspected once at import
+TOOLS = (get_information,)
+TOOLS_MAP = MappingProxyType({tool.__name__: tool for tool in TOOLS})
+TOOLS_SCHEMA = tuple(function_to_schema(tool) for tool in TOOLS)
+
+# Fixed pieces of the Vercel AI SDK data stream parts written by the OpenAI stream,
+# which yields bytes so the response does not re-encode every part
+_TEXT_PART = b"0:"
+_TOOL_CALL_PART = b"9:{"
+_TOOL_RESULT_PART = b"a:{"
+_RESULT_FIELD = b',"result":'
+_SOURCE_PART = b'h:{"sourceType":"url","id":'
+_PART_END = b"}\n"
+_FINISH_PART = (
+    b'e:{"finishReason":"%s","usage":{"promptTokens":%d,"completionTokens":%d},'
+    b'"isContinued":false}\n'
+)
+
+# Marks the end of a queued stream
+_STREAM_END = object()
+
+
+def new_stream_state() -> Dict[str, List[Any]]:
+    """Create the state that collects one stream's content, tool calls and tool results"""
+    return {"content_parts": [], "tool_calls": [], "tool_results": []}
+
+
+def _gemini_text(response: Any) -> str:
+    """
+    Get the text of a Gemini response or stream chunk in a single lookup
+
+    The SDK's ``text`` accessor raises ValueError when there is no text part
+    (e.g. a chunk carrying only a function call), which is treated as no text.
+    """
+    try:
+        return response.text
+    except (AttributeError, ValueError):
+        return ""
+
+
+def _dumps(obj: Any) -> str:
+    """
+    Serialize an object to a JSON string with orjson
+
+    Used where the API expects JSON text: OpenAI tool-call arguments and tool message
+    content, and the Gemini tool-call arguments and results; stream frames use _dumpb.
+    """
+    return _dumpb(obj).decode()
+
+
+def _dumpb(obj: Any) -> bytes:
+    """Serialize an object to JSON bytes with orjson, ready to be written to a stream"""
+    return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def _json_default(obj: Any) -> Any:
+    """Convert values orjson does not support natively, such as Gemini's proto maps and lists"""
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, (SequenceABC, Set)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+async def _drain_queue(queue: asyncio.Queue) -> AsyncIterator[Any]:
+    """Yield queued events until the end-of-stream marker"""
+    while True:
+        event = await queue.get()
+        if event is _STREAM_END:
+            return
+        yield event
+
+
+async def _next_event(events: AsyncIterator[Any]) -> Any:
+    """Await the next event of an async iterator (wrapped so it can run as a task)"""
+    return await events.__anext__()
+
+
+async def _coalesce_text_events(
+    events: AsyncIterator[Dict[str, Any]],
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Merge consecutive text-only events into larger bundles before yielding them downstream
+
+    Pending text is flushed once it reaches STREAM_COALESCE_CHARS or when the
+    STREAM_COALESCE_SECONDS window since the last flush runs out, even if no further
+    event arrives. The first token is always flushed immediately, and any non-text
+    event flushes the pending text first so ordering is preserved.
+    """
+    events = events.__aiter__()
+    buffer: List[str] = []
+    buffered_chars = 0
+    last_flush = float("-inf")
+    # The next event is awaited as a task so a flush deadline never cancels the source
+    pending: Optional[asyncio.Task] = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.create_task(_next_event(events))
+
+            if buffer:
+                # Wait for the next event only until the pending text is due
+                remaining = last_flush + STREAM_COALESCE_SECONDS - time.monotonic()
+                done, _ = await asyncio.wait((pending,), timeout=max(remaining, 0))
+                if not done:
+                    yield {"content": "".join(buffer)}
+                    buffer = []
+                    buffered_chars = 0
+                    last_flush = time.monotonic()
+                    continue
+
+            try:
+                event = await pending
+            except StopAsyncIteration:
+                pending = None
+                break
+            pending = None
+
+            if event.keys() == {"content"}:
+                buffer.append(event["content"])
+                buffered_chars += len(event["content"])
+
+                if (
+                    buffered_chars >= STREAM_COALESCE_CHARS
+                    or time.monotonic() - last_flush >= STREAM_COALESCE_SECONDS
+                ):
+                    yield {"content": "".join(buffer)}
+                    buffer = []
+                    buffered_chars = 0
+                    last_flush = time.monotonic()
+                continue
+
+            if buffer:
+                yield {"content": "".join(buffer)}
+                buffer = []
+                buffered_chars = 0
+                last_flush = time.monotonic()
+
+            yield event
+
+        if buffer:
+            yield {"content": "".join(buffer)}
+    finally:
+        # Stop reading ahead if the consumer went away
+        if pending is not None:
+            pending.cancel()
+
+
+# Tool usage instructions appended to every system prompt
+_TOOL_INSTRUCTIONS = (
+    "IMPORTANT TOOL USAGE INSTRUCTIONS:\n"
+    "- You have access to several tools that can provide real-time information. Always use these tools when appropriate.\n"
+    "- When a user asks for real-time or external information that can be answered by a tool, use that tool rather than providing general information.\n"
+    "- Use tools in a logical sequence. If one tool depends on the output of another tool, call them in the correct order.\n"
+    "- For location-based queries without a specified location, get the user's location first before using location-dependent tools.\n"
+    "- Read each tool's description carefully to understand when and how to use it appropriately.\n"
+    "- For queries requiring real-time data (weather, time, location, etc.), always prefer using the appropriate tool over giving general responses."
+)
+
+# System prompt used when no retrieved context is available
+_SYSTEM_PROMPT_NO_CONTEXT = (
+    "You are a helpful healthcare assistant. Provide accurate and helpful information about healthcare topics.\n\n"
+    + _TOOL_INSTRUCTIONS
+)
+
+
+def _build_system_prompt(context: Optional[str] = None) -> str:
+    """Build the system prompt, embedding the retrieved context if provided"""
+    if not context:
+        return _SYSTEM_PROMPT_NO_CONTEXT
+
+    return (
+        "You are a helpful healthcare assistant. Answer questions based on the following context.\n\n"
+        f"Context: {context}\n\n"
+        "If the answer is not in the context, respond based on your general healthcare knowledge.\n\n"
+        f"{_TOOL_INSTRUCTIONS}"
+    )
+
+
+@lru_cache(maxsize=128)
+def _format_gemini_system_message(context: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the Gemini system message for the given context.
+
+    The result is cached and shared between requests, so it must be treated as read-only.
+    """
+    return {"role": "system", "parts": [_build_system_prompt(context)]}
+
+
+@lru_cache(maxsize=1024)
+def _format_gemini_message(role: str, content: str) -> Dict[str, Any]:
+    """
+    Format a single history message for Gemini.
+
+    The result is cached and shared between requests, so it must be treated as read-only.
+    """
+    if role == "system":
+        role = "model"  # Gemini uses "model" instead of "system"
+
+    return {"role": role, "parts": [content]}
 
 
 class LLMService:
@@ -19,8 +253,9 @@ class LLMService:
         self.provider = settings.LLM_PROVIDER
 
         if self.provider == "openai":
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            self.async_client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+            # The client reuses the process-wide connection pool
+            self.async_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY, http_client=_ASYNC_HTTP_CLIENT)
             self.model = settings.OPENAI_MODEL
         elif self.provider == "gemini":
             genai.configure(api_key=settings.GEMINI_API_KEY)
@@ -30,183 +265,198 @@ class LLMService:
             raise ValueError(
                 f"Unsupported LLM provider: {settings.LLM_PROVIDER}")
 
-        # Register available tools
-        self.tools = [get_information]
-        self.tools_map = {tool.__name__: tool for tool in self.tools}
-        self.tools_schema = [function_to_schema(tool) for tool in self.tools]
+        # Register available tools (shared, built once at import)
+        self.tools = TOOLS
+        self.tools_map = TOOLS_MAP
+        self.tools_schema = TOOLS_SCHEMA
+
+        # Tool calls currently running, keyed by tool and arguments
+        self._inflight_tool_calls: Dict[str, asyncio.Task] = {}
+
+        # Bind the provider's streaming implementation once
+        self._stream_impl = {
+            "openai": self._stream_openai,
+            "gemini": self._stream_gemini,
+        }.get(self.provider, self._stream_fallback)
+
+        # Caps how many streams are generated at once; extra streams wait for a slot
+        self._stream_semaphore = asyncio.Semaphore(settings.MAX_CONCURRENT_STREAMS)
+
+        # Caps how many blocking tool calls may occupy worker threads at once
+        self._tool_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TOOL_CALLS)
+
+        # Tool-free responses keyed by request
+        self._response_cache = TTLCache(
+            settings.LLM_RESPONSE_CACHE_SIZE, settings.LLM_RESPONSE_CACHE_TTL)
 
-        # Streaming state variables
-        self.current_stream_content = ""
-        self.current_stream_tool_calls = []
-        self.current_stream_tool_results = []
+        # Gemini model is built once here and reused across requests
+        self._gemini_model = None
+        if self.provider == "gemini":
+            self._get_gemini_model()
 
-    def _execute_tool_call(self, tool_call: Dict[str, Any]) -> Any:
+    async def _execute_tool_call(self, tool_call: Dict[str, Any]) -> Any:
         """Execute a tool call and return the result"""
         tool_name = tool_call["function"]["name"]
-        tool_args = json.loads(tool_call["function"]["arguments"])
+        tool_args = orjson.loads(tool_call["function"]["arguments"])
 
         if tool_name in self.tools_map:
             tool = self.tools_map[tool_name]
-            return tool(**tool_args)
+            return await self._invoke_tool(tool, **tool_args)
         else:
             raise ValueError(f"Tool {tool_name} not found in tools map.")
 
+    async def warm_up(self) -> None:
+        """
+        Open connections to the LLM provider ahead of the first request
+
+        The OpenAI client shares the process-wide pool, so the keep-alive
+        connection opened here is reused by every later call. Gemini requests
+        run on the SDK's own generative client, which has no cheap call to
+        warm it with, so nothing is done for Gemini.
+        """
+        if self.provider == "openai":
+            await self.async_client.models.list()
+
+    async def _invoke_tool(self, tool: Callable[..., Any], **tool_args: Any) -> Any:
+        """
+        Invoke a tool, sharing the result of an identical call that is already in flight
+
+        Calls are identical when they target the same tool with the same JSON arguments.
+        Calls with arguments that are not JSON serializable are never shared.
+        """
+        try:
+            key = f"{tool.__module__}.{tool.__qualname__}:" + orjson.dumps(
+                tool_args, default=_json_default, option=orjson.OPT_SORT_KEYS
+            ).decode()
+        except TypeError:
+            return await self._call_tool(tool, **tool_args)
+
+        task = self._inflight_tool_calls.get(key)
+        if task is None:
+            task = asyncio.create_task(self._call_tool(tool, **tool_args))
+            self._inflight_tool_calls[key] = task
+            task.add_done_callback(
+                lambda _: self._inflight_tool_calls.pop(key, None))
+
+        # Shield so a caller going away does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    async def _call_tool(self, tool: Callable[..., Any], **tool_args: Any) -> Any:
+        """
+        Call a tool without blocking the event loop
+
+        Coroutine tools are awaited directly. Regular tools run in a worker thread
+        unless they are marked with ``blocking = False`` (pure, fast computations).
+        """
+        if inspect.iscoroutinefunction(tool):
+            return await tool(**tool_args)
+
+        if not getattr(tool, "blocking", True):
+            return tool(**tool_args)
+
+        async with self._tool_semaphore:
+            return await asyncio.to_thread(tool, **tool_args)
+
+    def _get_gemini_model(self) -> Any:
+        """Get the cached Gemini model; tools are passed per request, not bound to the model"""
+        if self._gemini_model is None:
+            self._gemini_model = self.client.GenerativeModel(
+                model_name=self.model,
+                generation_config=dict(GEMINI_GENERATION_CONFIG),
+            )
+
+        return self._gemini_model
+
     def _format_openai_messages(
         self, messages: List[Dict[str, str]], context: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """Format messages for OpenAI API with optional context"""
-        formatted_messages = []
-
-        # Add system message with context if provided
-        if context:
-            system_message = {
-                "role": "system",
-                "content": (
-                    "You are a helpful healthcare assistant. Answer questions based on the following context.\n\n"
-                    f"Context: {context}\n\n"
-                    "If the answer is not in the context, respond based on your general healthcare knowledge.\n\n"
-                    "IMPORTANT TOOL USAGE INSTRUCTIONS:\n"
-                    "- You have access to several tools that can provide real-time information. Always use these tools when appropriate.\n"
-                    "- When a user asks for real-time or external information that can be answered by a tool, use that tool rather than providing general information.\n"
-                    "- Use tools in a logical sequence. If one tool depends on the output of another tool, call them in the correct order.\n"
-                    "- For location-based queries without a specified location, get the user's location first before using location-dependent tools.\n"
-                    "- Read each tool's description carefully to understand when and how to use it appropriately.\n"
-                    "- For queries requiring real-time data (weather, time, location, etc.), always prefer using the appropriate tool over giving general responses."
-                ),
-            }
-        else:
-            system_message = {
-                "role": "system",
-                "content": (
-                    "You are a helpful healthcare assistant. Provide accurate and helpful information about healthcare topics.\n\n"
-                    "IMPORTANT TOOL USAGE INSTRUCTIONS:\n"
-                    "- You have access to several tools that can provide real-time information. Always use these tools when appropriate.\n"
-                    "- When a user asks for real-time or external information that can be answered by a tool, use that tool rather than providing general information.\n"
-                    "- Use tools in a logical sequence. If one tool depends on the output of another tool, call them in the correct order.\n"
-                    "- For location-based queries without a specified location, get the user's location first before using location-dependent tools.\n"
-                    "- Read each tool's description carefully to understand when and how to use it appropriately.\n"
-                    "- For queries requiring real-time data (weather, time, location, etc.), always prefer using the appropriate tool over giving general responses."
-                ),
-            }
+        system_message = {
+            "role": "system",
+            "content": _build_system_prompt(context),
+        }
 
-        formatted_messages.append(system_message)
-
-        # Add the rest of the messages
-        for message in messages:
-            formatted_messages.append(message)
-
-        return formatted_messages
+        return [system_message, *messages]
 
     def _format_gemini_messages(
         self, messages: List[Dict[str, str]], context: Optional[str] = None
     ) -> List[Dict[str, str]]:
         """Format messages for Gemini API with optional context"""
-        formatted_messages = []
-
-        # Add system message with context if provided
-        if context:
-            system_content = (
-                "You are a helpful healthcare assistant. Answer questions based on the following context.\n\n"
-                f"Context: {context}\n\n"
-                "If the answer is not in the context, respond based on your general healthcare knowledge.\n\n"
-                "IMPORTANT TOOL USAGE INSTRUCTIONS:\n"
-                "- You have access to several tools that can provide real-time information. Always use these tools when appropriate.\n"
-                "- When a user asks for real-time or external information that can be answered by a tool, use that tool rather than providing general information.\n"
-                "- Use tools in a logical sequence. If one tool depends on the output of another tool, call them in the correct order.\n"
-                "- For location-based queries without a specified location, get the user's location first before using location-dependent tools.\n"
-                "- Read each tool's description carefully to understand when and how to use it appropriately.\n"
-                "- For queries requiring real-time data (weather, time, location, etc.), always prefer using the appropriate tool over giving general responses."
-            )
-        else:
-            system_content = (
-                "You are a helpful healthcare assistant. Provide accurate and helpful information about healthcare topics.\n\n"
-                "IMPORTANT TOOL USAGE INSTRUCTIONS:\n"
-                "- You have access to several tools that can provide real-time information. Always use these tools when appropriate.\n"
-                "- When a user asks for real-time or external information that can be answered by a tool, use that tool rather than providing general information.\n"
-                "- Use tools in a logical sequence. If one tool depends on the output of another tool, call them in the correct order.\n"
-                "- For location-based queries without a specified location, get the user's location first before using location-dependent tools.\n"
-                "- Read each tool's description carefully to understand when and how to use it appropriately.\n"
-                "- For queries requiring real-time data (weather, time, location, etc.), always prefer using the appropriate tool over giving general responses."
-            )
-
-        # Add system message
-        formatted_messages.append(
-            {"role": "system", "parts": [system_content]})
-
-        # Add the rest of the messages
-        for message in messages:
-            role = message["role"]
-            content = message["content"]
-
-            if role == "system":
-                role = "model"  # Gemini uses "model" instead of "system"
-
-            formatted_message = {"role": role, "parts": [content]}
-            formatted_messages.append(formatted_message)
+        # Add system message followed by the rest of the messages; both are
+        # memoized so follow-up calls over the same history reuse them
+        formatted_messages = [_format_gemini_system_message(context)]
+        formatted_messages.extend(
+            _format_gemini_message(message["role"], message["content"])
+            for message in messages
+        )
 
         return formatted_messages
 
     def convert_to_openai_messages(self, messages: List[Any]):
-        openai_messages = [
-            # {
-            #     "role": "system",
-            #     "content": (
-            #     "You are a helpful healthcare assistant. Provide accurate and helpful information about healthcare topics.\n\n"
-            #     "IMPORTANT TOOL USAGE INSTRUCTIONS:\n"
-            #     "- You have access to several tools that can provide real-time information. Always use these tools when appropriate.\n"
-            #     "- When a user asks for real-time or external information that can be answered by a tool, use that tool rather than providing general information.\n"
-            #     "- Use tools in a logical sequence. If one tool depends on the output of another tool, call them in the correct order.\n"
-            #     "- For location-based queries without a specified location, get the user's location first before using location-dependent tools.\n"
-            #     "- Read each tool's description carefully to understand when and how to use it appropriately.\n"
-            #     "- For queries requiring real-time data (weather, time, location, etc.), always prefer using the appropriate tool over giving general responses.")
-            # }
-        ]
-
-        for message in messages:
-            parts = []
-
-            parts.append({
-                'type': 'text',
-                'text': message.content
-            })
-
-            if (message.toolInvocations):
-                tool_calls = [
-                    {
-                        'id': tool_invocation.toolCallId,
-                        'type': 'function',
-                        'function': {
-                            'name': tool_invocation.toolName,
-                            'arguments': json.dumps(tool_invocation.args)
-                        }
-                    }
-                    for tool_invocation in message.toolInvocations]
-
-                openai_messages.append({
-                    "role": 'assistant',
-                    "tool_calls": tool_calls
-                })
-
-                tool_results = [
-                    {
-                        'role': 'tool',
-                        'content': json.dumps(tool_invocation.result),
-                        'tool_call_id': tool_invocation.toolCallId
+        """Convert Vercel AI SDK client messages to OpenAI chat messages"""
+        return list(chain.from_iterable(
+            self._convert_openai_message(message) for message in messages))
+
+    @staticmethod
+    def _convert_openai_message(message: Any) -> Iterator[Dict[str, Any]]:
+        """Yield the OpenAI chat messages for a single client message"""
+        if not message.toolInvocations:
+            yield {
+                "role": message.role,
+                "content": [{'type': 'text', 'text': message.content}]
+            }
+            return
+
+        # An assistant message carrying the tool calls, then one message per result
+        yield {
+            "role": 'assistant',
+            "tool_calls": [
+                {
+                    'id': tool_invocation.toolCallId,
+                    'type': 'function',
+                    'function': {
+                        'name': tool_invocation.toolName,
+                        'arguments': _dumps(tool_invocation.args)
                     }
-                    for tool_invocation in message.toolInvocations]
-
-                openai_messages.extend(tool_results)
-
-                continue
+                }
+                for tool_invocation in message.toolInvocations]
+        }
+
+        for tool_invocation in message.toolInvocations:
+            yield {
+                'role': 'tool',
+                'content': _dumps(tool_invocation.result),
+                'tool_call_id': tool_invocation.toolCallId
+            }
 
-            openai_messages.append({
-                "role": message.role,
-                "content": parts
-            })
+    def _response_cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        context: Optional[str],
+        execute_tools: bool,
+    ) -> Optional[str]:
+        """Build the response cache key for a request, or None if it cannot be cached"""
+        if settings.LLM_RESPONSE_CACHE_TTL <= 0 or settings.LLM_RESPONSE_CACHE_SIZE <= 0:
+            return None
+
+        try:
+            payload = orjson.dumps(
+                {
+                    "provider": self.provider,
+                    "model": self.model,
+                    "messages": messages,
+                    "context": context,
+                    "tools": self.tools_schema,
+                    "execute_tools": execute_tools,
+                },
+                option=orjson.OPT_SORT_KEYS,
+            )
+        except TypeError:
+            return None
 
-        return openai_messages
+        return hashlib.sha256(payload).hexdigest()
 
-    def generate_response(
+    async def generate_response(
         self,
         messages: List[Dict[str, str]],
         context: Optional[str] = None,
@@ -215,6 +465,9 @@ class LLMService:
         """
         Generate a response from the LLM based on messages and optional context
 
+        Identical requests answered without tool calls are served from an
+        in-memory cache for LLM_RESPONSE_CACHE_TTL seconds.
+
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             context: Optional context from retrieved documents
@@ -223,14 +476,38 @@ class LLMService:
         Returns:
             Dictionary with response content, optional tool calls, and tool results if executed
         """
+        key = self._response_cache_key(messages, context, execute_tools)
+        if key is not None:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                return {**cached, "conversation_turns": []}
+
+        result = await self._generate_response(messages, context, execute_tools)
+
+        # Tool results reflect live data, so only tool-free responses are reused
+        if key is not None and not result["conversation_turns"]:
+            self._response_cache.set(key, result)
+
+        return result
+
+    async def _generate_response(
+        self,
+        messages: List[Dict[str, str]],
+        context: Optional[str] = None,
+        execute_tools: bool = True,
+    ) -> Dict[str, Any]:
+        """Generate a response from the configured provider (see generate_response)"""
         if self.provider == "openai":
             # Format messages for OpenAI
+            formatted_messages = self._format_openai_messages(
+                messages, context)
 
-            # Initialize conversation history for this turn
-            conversation_messages = formatted_messages.copy()
+            # The formatted list is built fresh per call, so the turn extends it in place
+            conversation_messages = formatted_messages
+            append_message = conversation_messages.append
 
             # Start the initial LLM call
-            response = self.client.chat.completions.create(
+            response = await self.async_client.chat.completions.create(
                 model=self.model,
                 messages=conversation_messages,
                 tools=self.tools_schema,
@@ -259,11 +536,10 @@ class LLMService:
 
                 while True:
                     # Process current response with tool calls
-                    tool_calls = []
                     tool_results = []
 
                     # Add the assistant message to conversation
-                    conversation_messages.append(
+                    append_message(
                         {
                             "role": "assistant",
                             "content": response_content,
@@ -271,9 +547,9 @@ class LLMService:
                         }
                     )
 
-                    # Process all tool calls in this response
-                    for tool_call in response_message.tool_calls:
-                        tool_call_data = {
+                    # Collect all tool calls in this response
+                    tool_calls = [
+                        {
                             "id": tool_call.id,
                             "type": "function",
                             "function": {
@@ -281,28 +557,32 @@ class LLMService:
                                 "arguments": tool_call.function.arguments,
                             },
                         }
-                        tool_calls.append(tool_call_data)
-
-                        # Execute the tool
-                        try:
-                            result_value = self._execute_tool_call(
-                                tool_call_data)
-                            tool_result = {
-                                "tool_call_id": tool_call.id,
-                                "function_name": tool_call.function.name,
-                                "result": result_value,
-                            }
-                        except Exception as e:
-                            tool_result = {
-                                "tool_call_id": tool_call.id,
-                                "function_name": tool_call.function.name,
-                                "error": str(e),
-                            }
+                        for tool_call in response_message.tool_calls
+                    ]
+
+                    # Execute the tools concurrently; outcomes keep the call order
+                    outcomes = await asyncio.gather(
+                        *(
+                            self._execute_tool_call(tool_call_data)
+                            for tool_call_data in tool_calls
+                        ),
+                        return_exceptions=True,
+                    )
+
+                    for tool_call_data, outcome in zip(tool_calls, outcomes):
+                        tool_result = {
+                            "tool_call_id": tool_call_data["id"],
+                            "function_name": tool_call_data["function"]["name"],
+                        }
+                        if isinstance(outcome, BaseException):
+                            tool_result["error"] = str(outcome)
+                        else:
+                            tool_result["result"] = outcome
 
                         tool_results.append(tool_result)
 
                         # Add tool result to conversation
-                        conversation_messages.append(
+                        append_message(
                             {
                                 "role": "tool",
                                 "tool_call_id": tool_result["tool_call_id"],
@@ -325,7 +605,7 @@ class LLMService:
                     result["conversation_turns"].append(turn_info)
 
                     # Make a follow-up call with the updated conversation
-                    follow_up_response = self.client.chat.completions.create(
+                    follow_up_response = await self.async_client.chat.completions.create(
                         model=self.model,
                         messages=conversation_messages,
                         tools=self.tools_schema,
@@ -361,28 +641,19 @@ class LLMService:
             formatted_messages = self._format_gemini_messages(
                 messages, context)
 
-            # Initialize Gemini model
-            generation_config = {
-                "temperature": 0.7,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 1024,
-            }
-
-            model = self.client.GenerativeModel(
-                model_name=self.model, generation_config=generation_config
-            )
+            # Reuse the cached Gemini model
+            model = self._get_gemini_model()
 
-            # Initialize conversation history for this turn
-            conversation_messages = formatted_messages.copy()
+            # The formatted list is built fresh per call, so the turn extends it in place
+            conversation_messages = formatted_messages
+            append_message = conversation_messages.append
 
             # Start the initial LLM call
-            response = model.generate_content(
-                conversation_messages, tools=self.tools_schema
-            )
+            response = await model.generate_content_async(
+                conversation_messages, tools=self.tools_schema)
 
             # Extract text content
-            response_content = response.text
+            response_content = _gemini_text(response)
 
             # Initialize result dictionary
             result = {
@@ -393,238 +664,213 @@ class LLMService:
 
             # Process tool calls if they exist
             turn_number = 1
-            has_tool_calls = False
+            function_call_parts = (
+                self._gemini_function_call_parts(response) if execute_tools else []
+            )
 
-            if (
-                execute_tools
-                and hasattr(response, "candidates")
-                and response.candidates
-            ):
-                # Check for tool calls in the response
-                candidate = response.candidates[0]
-                if hasattr(candidate, "content") and candidate.content:
-                    content = candidate.content
-                    if hasattr(content, "parts") and content.parts:
-                        for part in content.parts:
-                            if hasattr(part, "function_call"):
-                                has_tool_calls = True
-                                break
-
-            while has_tool_calls and turn_number <= MAX_TOOL_CALLS:
+            while function_call_parts and turn_number <= MAX_TOOL_CALLS:
                 # Process current response with tool calls
-                tool_calls = []
                 tool_results = []
 
-                # Add the model message to conversation
-                follow_up_message = {"role": "model",
-                                     "parts": [response_content]}
-                conversation_messages.append(follow_up_message)
-
-                # Get tool calls from the response
-                if hasattr(response, "candidates") and response.candidates:
-                    candidate = response.candidates[0]
-                    if hasattr(candidate, "content") and candidate.content:
-                        content = candidate.content
-                        if hasattr(content, "parts") and content.parts:
-                            for part in content.parts:
-                                if hasattr(part, "function_call"):
-                                    # Format Gemini function call
-                                    tool_call_data = {
-                                        "id": f"call_{turn_number}_{len(tool_calls)}",
-                                        "type": "function",
-                                        "function": {
-                                            "name": part.function_call.name,
-                                            "arguments": json.dumps(
-                                                part.function_call.args
-                                            ),
-                                        },
-                                    }
-                                    tool_calls.append(tool_call_data)
-
-                                    # Execute the tool
-                                    try:
-                                        result_value = self._execute_tool_call(
-                                            tool_call_data
-                                        )
-                                        tool_result = {
-                                            "tool_call_id": tool_call_data["id"],
-                                            "function_name": part.function_call.name,
-                                            "result": result_value,
-                                        }
-                                    except Exception as e:
-                                        tool_result = {
-                                            "tool_call_id": tool_call_data["id"],
-                                            "function_name": part.function_call.name,
-                                            "error": str(e),
-                                        }
-
-                                    tool_results.append(tool_result)
-
-                                    # Add tool result to conversation (Gemini format)
-                                    result_message = {
-                                        "role": "user",
-                                        "parts": [
-                                            f"Tool {tool_result['function_name']} returned: {str(tool_result.get('result', tool_result.get('error', '')))}"
-                                        ],
-                                    }
-                                    conversation_messages.append(
-                                        result_message)
+                # Add the model message to conversation: its text (if any) and the
+                # function calls the tool results below answer
+                follow_up_message = {
+                    "role": "model",
+                    "parts": [
+                        *([{"text": response_content}] if response_content else ()),
+                        *function_call_parts,
+                    ],
+                }
+                append_message(follow_up_message)
+
+                # Format Gemini function calls
+                tool_calls = [
+                    {
+                        "id": f"call_{turn_number}_{index}",
+                        "type": "function",
+                        "function": {
+                            "name": function_call.name,
+                            "arguments": _dumps(function_call.args),
+                        },
+                    }
+                    for index, function_call in enumerate(
+                        part.function_call for part in function_call_parts)
+                ]
+
+                # Execute the tools concurrently; outcomes keep the call order
+                outcomes = await asyncio.gather(
+                    *(
+                        self._execute_tool_call(tool_call_data)
+                        for tool_call_data in tool_calls
+                    ),
+                    return_exceptions=True,
+                )
+
+                for tool_call_data, outcome in zip(tool_calls, outcomes):
+                    tool_result = {
+                        "tool_call_id": tool_call_data["id"],
+                        "function_name": tool_call_data["function"]["name"],
+                    }
+                    if isinstance(outcome, BaseException):
+                        tool_result["error"] = str(outcome)
+                    else:
+                        tool_result["result"] = outcome
 
-                # Store this turn's information
-                if tool_calls:
-                    turn_info = {
-                        "turn": turn_number,
-                        "content": response_content,
-                        "tool_calls": tool_calls,
-                        "tool_results": tool_results,
+                    tool_results.append(tool_result)
+
+                    # Add tool result to conversation (Gemini format)
+                    result_message = {
+                        "role": "user",
+                        "parts": [
+                            f"Tool {tool_result['function_name']} returned: {str(tool_result.get('result', tool_result.get('error', '')))}"
+                        ],
                     }
-                    result["conversation_turns"].append(turn_info)
+                    append_message(result_message)
 
-                    # Make a follow-up call with the updated conversation
-                    follow_up_response = model.generate_content(
-                        conversation_messages, tools=self.tools_schema
-                    )
+                # Store this turn's information
+                turn_info = {
+                    "turn": turn_number,
+                    "content": response_content,
+                    "tool_calls": tool_calls,
+                    "tool_results": tool_results,
+                }
+                result["conversation_turns"].append(turn_info)
 
-                    # Update response for next iteration
-                    response = follow_up_response
-                    response_content = response.text
+                # Make a follow-up call with the updated conversation
+                follow_up_response = await model.generate_content_async(
+                    conversation_messages, tools=self.tools_schema)
 
-                    # Update the final content with the latest response
-                    result["final_content"] = response_content
+                # Update response for next iteration
+                response = follow_up_response
+                response_content = _gemini_text(response)
 
-                    # Check if we have more tool calls
-                    has_tool_calls = False
-                    if hasattr(response, "candidates") and response.candidates:
-                        candidate = response.candidates[0]
-                        if hasattr(candidate, "content") and candidate.content:
-                            content = candidate.content
-                            if hasattr(content, "parts") and content.parts:
-                                for part in content.parts:
-                                    if hasattr(part, "function_call"):
-                                        has_tool_calls = True
-                                        break
-
-                    # Increment turn counter
-                    turn_number += 1
-                else:
-                    # No tool calls found, exit the loop
-                    break
+                # Update the final content with the latest response
+                result["final_content"] = response_content
+
+                # Check if we have more tool calls
+                function_call_parts = self._gemini_function_call_parts(response)
+
+                # Increment turn counter
+                turn_number += 1
 
             return result
 
         else:
             raise ValueError(f"Unsupported LLM provider: {self.provider}")
 
-    async def generate_response_stream(
+    @staticmethod
+    def _gemini_function_call_parts(response: Any) -> List[Any]:
+        """Return the parts of a Gemini response's first candidate that request a function call"""
+        try:
+            parts = response.candidates[0].content.parts
+        except (AttributeError, IndexError):
+            return []
+
+        return [part for part in parts if getattr(part, "function_call", None)]
+
+    def generate_response_stream(
         self,
         messages: List[Any],
         context: Optional[str] = None,
-    ) -> Any:
+        stream_state: Optional[Dict[str, List[Any]]] = None,
+    ) -> AsyncIterator[Any]:
         """
         Stream a response from the LLM based on messages and optional context
 
         Args:
             messages: List of message dictionaries with 'role' and 'content'
             context: Optional context from retrieved documents
+            stream_state: Optional state from new_stream_state() that collects the streamed
+                content, tool calls and tool results of this stream only
 
-        Yields:
-            Chunks of the response in a format compatible with Vercel AI SDK
+        Returns:
+            Async iterator over chunks of the response in a format compatible with Vercel AI SDK,
+            produced by the streaming implementation bound for the configured provider
         """
-        # Reset streaming state
-        self.current_stream_content = ""
-        self.current_stream_tool_calls = []
-        self.current_stream_tool_results = []
+        if stream_state is None:
+            stream_state = new_stream_state()
 
-        if self.provider == "openai":
-            # Format messages for OpenAI
-            openai_messages = self.convert_to_openai_messages(messages)
+        return self._bounded_stream(self._stream_impl(messages, context, stream_state))
 
-            # Start streaming response
-            stream = self.client.chat.completions.create(
-                model=self.model,
-                messages=openai_messages,
-                tools=self.tools_schema,
-                max_tokens=512,
-                stream=True,
-            )
+    async def _bounded_stream(self, stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """Hold a stream slot for the lifetime of a stream"""
+        async with self._stream_semaphore:
+            async for event in stream:
+                yield event
 
-            draft_tool_calls = []
-            draft_tool_calls_index = -1
-
-            for chunk in stream:
+    async def _stream_openai(
+        self,
+        messages: List[Any],
+        context: Optional[str],
+        stream_state: Dict[str, List[Any]],
+    ) -> AsyncIterator[bytes]:
+        """Stream an OpenAI response as UTF-8 encoded Vercel AI SDK data stream parts"""
+        # Merge bursts of text deltas into fewer text parts; other parts flush pending text
+        async for event in _coalesce_text_events(
+                self._openai_stream_events(messages, stream_state)):
+            if "frame" in event:
+                yield event["frame"]
+            else:
+                yield _TEXT_PART + _dumpb(event["content"]) + b"\n"
+
+    async def _openai_stream_events(
+        self, messages: List[Any], stream_state: Dict[str, List[Any]]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream an OpenAI response as text deltas and pre-rendered data stream parts"""
+        # Format messages for OpenAI
+        openai_messages = self.convert_to_openai_messages(messages)
+
+        # Start streaming response
+        stream = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=openai_messages,
+            tools=self.tools_schema,
+            max_tokens=512,
+            stream=True,
+        )
+
+        draft_tool_calls = []
+
+        # Close the underlying response if the client disconnects mid-stream
+        async with stream:
+            async for chunk in stream:
                 for choice in chunk.choices:
                     if choice.finish_reason == "stop":
                         continue
 
                     elif choice.finish_reason == "tool_calls":
+                        # Render the fields shared by a tool call's parts once; the
+                        # accumulated arguments are already JSON and are used as-is
                         for tool_call in draft_tool_calls:
-                            yield '9:{{"toolCallId":"{id}","toolName":"{name}","args":{args}}}\n'.format(
-                                id=tool_call["id"],
-                                name=tool_call["name"],
-                                args=tool_call["arguments"])
+                            tool_call["arguments"] = bytes(tool_call["arguments"]) or b"{}"
+                            tool_call["frame"] = b"".join((
+                                b'"toolCallId":', _dumpb(tool_call["id"]),
+                                b',"toolName":', _dumpb(tool_call["name"]),
+                                b',"args":', tool_call["arguments"],
+                            ))
 
                         for tool_call in draft_tool_calls:
-                            try:
-                                # Execute the tool with proper error handling
-                                tool_name = tool_call["name"]
-                                tool_args = json.loads(tool_call["arguments"])
-
-                                if tool_name in self.tools_map:
-                                    tool_fn = self.tools_map[tool_name]
-
-                                    # Execute the tool function
-                                    from sqlalchemy.orm import Session
-                                    from database import SessionLocal
-
-                                    try:
-                                        # Create a new session for this tool call
-                                        db = SessionLocal()
-
-                                        # Try to execute the tool with the session
-                                        if tool_name == "get_information":
-                                            # Special handling for get_information to pass db session
-                                            tool_result = tool_fn(
-                                                db=db, **tool_args)
-                                        else:
-                                            tool_result = tool_fn(**tool_args)
-
-                                        # Commit the session if successful
-                                        db.commit()
-                                    except Exception as db_err:
-                                        # Rollback on error
-                                        db.rollback()
-                                        raise db_err
-                                    finally:
-                                        # Always close the session
-                                        db.close()
-
-                                else:
-                                    tool_result = {
-                                        "error": f"Tool {tool_name} not found"}
-
-                                yield 'a:{{"toolCallId":"{id}","toolName":"{name}","args":{args},"result":{result}}}\n'.format(
-                                    id=tool_call["id"],
-                                    name=tool_call["name"],
-                                    args=tool_call["arguments"],
-                                    result=json.dumps(tool_result))
-
-                                if isinstance(tool_result, dict) and "sources" in tool_result:
-                                    print(f"sources: {tool_result['sources']}")
-                                    for source in tool_result["sources"]:
-                                        yield 'h:{{"sourceType":"url","id":"{id}","url":"{url}","title":"{title}"}}\n'.format(
-                                            id=source["id"],
-                                            url=source['url'],
-                                            title=source['title']
-                                        )
+                            yield {"frame": _TOOL_CALL_PART + tool_call["frame"] + _PART_END}
+
+                        # Run every tool call of this turn concurrently, then emit results in order
+                        tool_results = await asyncio.gather(
+                            *(self._run_stream_tool_call(tool_call)
+                              for tool_call in draft_tool_calls),
+                            return_exceptions=True,
+                        )
+
+                        for tool_call, tool_result in zip(draft_tool_calls, tool_results):
+                            if isinstance(tool_result, Exception):
+                                tool_result = {"error": str(tool_result)}
 
+                            # Render each call's parts in isolation so one bad result only
+                            # turns into an error result instead of ending the stream
+                            try:
+                                frame = self._render_tool_result(tool_call, tool_result)
                             except Exception as e:
-                                error_message = str(e)
-                                yield 'a:{{"toolCallId":"{id}","toolName":"{name}","args":{args},"result":{{"error":"{error_msg}"}}}}\n'.format(
-                                    id=tool_call["id"],
-                                    name=tool_call["name"],
-                                    args=tool_call["arguments"],
-                                    error_msg=error_message.replace('"', '\\"')
-                                )
+                                frame = self._render_tool_result(tool_call, {"error": str(e)})
+
+                            yield {"frame": frame}
 
                     elif choice.delta.tool_calls:
                         for tool_call in choice.delta.tool_calls:
@@ -632,210 +878,361 @@ class LLMService:
                             name = tool_call.function.name
                             arguments = tool_call.function.arguments
 
+                            # Argument fragments are accumulated as bytes and parsed once at the end
                             if (id is not None):
-                                draft_tool_calls_index += 1
                                 draft_tool_calls.append(
-                                    {"id": id, "name": name, "arguments": ""})
+                                    {"id": id, "name": name, "arguments": bytearray()})
 
-                            else:
-                                draft_tool_calls[draft_tool_calls_index]["arguments"] += arguments
+                            if arguments:
+                                draft_tool_calls[-1]["arguments"].extend(
+                                    arguments.encode())
 
                     else:
-                        yield '0:{text}\n'.format(text=json.dumps(choice.delta.content))
+                        content = choice.delta.content
+                        if content:
+                            stream_state["content_parts"].append(content)
+                            yield {"content": content}
 
                 if chunk.choices == []:
                     usage = chunk.usage
                     prompt_tokens = usage.prompt_tokens
                     completion_tokens = usage.completion_tokens
 
-                    yield 'e:{{"finishReason":"{reason}","usage":{{"promptTokens":{prompt},"completionTokens":{completion}}},"isContinued":false}}\n'.format(
-                        reason="tool-calls" if len(
-                            draft_tool_calls) > 0 else "stop",
-                        prompt=prompt_tokens,
-                        completion=completion_tokens
-                    )
+                    reason = b"tool-calls" if draft_tool_calls else b"stop"
+                    yield {"frame": _FINISH_PART % (reason, prompt_tokens, completion_tokens)}
 
-        elif self.provider == "gemini":
-            # Format messages for Gemini
-            formatted_messages = self._format_gemini_messages(
-                messages, context)
+    @staticmethod
+    def _render_tool_result(tool_call: Dict[str, Any], tool_result: Any) -> bytes:
+        """Render a tool result part, followed by a source part for each source with a URL"""
+        frames = [
+            _TOOL_RESULT_PART, tool_call["frame"],
+            _RESULT_FIELD, _dumpb(tool_result), _PART_END,
+        ]
 
-            # Initialize Gemini model with streaming config
-            generation_config = {
-                "temperature": 0.7,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 1024,
-            }
+        if isinstance(tool_result, dict):
+            for source in tool_result.get("sources") or ():
+                # Knowledge base documents without a web URL have no link to show
+                url = source.get("url")
+                if not url:
+                    continue
 
-            model = self.client.GenerativeModel(
-                model_name=self.model,
-                generation_config=generation_config
-            )
+                frames += (
+                    _SOURCE_PART, _dumpb(source["id"]),
+                    b',"url":', _dumpb(url),
+                    b',"title":', _dumpb(source.get("title")), _PART_END,
+                )
+
+        return b"".join(frames)
+
+    async def _run_stream_tool_call(self, tool_call: Dict[str, Any]) -> Any:
+        """Execute a finalized streaming tool call and return its result"""
+        tool_name = tool_call["name"]
+        tool_args = orjson.loads(tool_call["arguments"])
+
+        if tool_name not in self.tools_map:
+            return {"error": f"Tool {tool_name} not found"}
+
+        return await self._invoke_tool(self.tools_map[tool_name], **tool_args)
+
+    async def _stream_gemini(
+        self,
+        messages: List[Any],
+        context: Optional[str],
+        stream_state: Dict[str, List[Any]],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a Gemini response as event dictionaries"""
+        # Format messages for Gemini
+        formatted_messages = self._format_gemini_messages(
+            messages, context)
+
+        # Reuse the cached Gemini model
+        model = self._get_gemini_model()
+
+        # Gemini events are produced by a background task (which may run several
+        # follow-up streams concurrently) and consumed here through a bounded queue
+        queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        producer = asyncio.create_task(
+            self._produce_gemini_stream(
+                model, formatted_messages, queue, stream_state)
+        )
+
+        try:
+            async for event in _coalesce_text_events(_drain_queue(queue)):
+                yield event
+        finally:
+            # Stop producing if the client went away before the stream finished
+            producer.cancel()
+
+    async def _stream_fallback(
+        self,
+        messages: List[Any],
+        context: Optional[str],
+        stream_state: Dict[str, List[Any]],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream a non-streaming response for providers without a streaming implementation"""
+        # Fallback for providers without a streaming implementation
+        # Generate a non-streaming response
+        response = await self.generate_response(messages, context)
+
+        # Yield the entire content
+        yield {"content": response["final_content"]}
+
+        # Store for database
+        stream_state["content_parts"].append(response["final_content"])
 
+        # Collect tool calls and results
+        for turn in response["conversation_turns"]:
+            if turn.get("tool_calls"):
+                stream_state["tool_calls"].extend(turn["tool_calls"])
+
+            if turn.get("tool_results"):
+                stream_state["tool_results"].extend(
+                    turn["tool_results"])
+
+        # Signal completion
+        yield {"finish_reason": "stop"}
+
+    async def _produce_gemini_stream(
+        self,
+        model: Any,
+        formatted_messages: List[Dict[str, Any]],
+        queue: asyncio.Queue,
+        stream_state: Dict[str, List[Any]],
+    ) -> None:
+        """
+        Stream a Gemini response into a queue, running tool calls and follow-ups concurrently
+
+        Each follow-up answer is buffered in its own queue while it streams, and the
+        answers are forwarded one after another (in call order) once the primary stream
+        ends, so concurrent answers never interleave.
+
+        Args:
+            model: Gemini model to generate content with
+            formatted_messages: Messages formatted for Gemini
+            queue: Queue receiving the streamed events, terminated by _STREAM_END
+            stream_state: State collecting the content, tool calls and results of this stream
+        """
+        cancelled = False
+        try:
             # Start streaming generation
-            stream = model.generate_content(
+            stream = await model.generate_content_async(
                 formatted_messages,
+                stream=True,
                 tools=self.tools_schema,
-                stream=True
             )
 
-            # Initialize tool tracking
-            is_processing_tool_call = False
-            current_tool_call = None
+            # One text queue per function call, in call order
+            follow_up_queues: List[asyncio.Queue] = []
 
-            try:
+            async with asyncio.TaskGroup() as follow_ups:
                 # Process the streaming response
                 async for chunk in stream:
                     # Process text chunks
-                    if hasattr(chunk, "text"):
-                        text_chunk = chunk.text
-                        if text_chunk:
-                            self.current_stream_content += text_chunk
-                            yield {"content": text_chunk}
+                    text_chunk = _gemini_text(chunk)
+                    if text_chunk:
+                        stream_state["content_parts"].append(text_chunk)
+                        await queue.put({"content": text_chunk})
 
                     # Process any parts in the chunk
-                    if hasattr(chunk, "candidates") and chunk.candidates:
-                        candidate = chunk.candidates[0]
-                        if hasattr(candidate, "content") and candidate.content:
-                            content = candidate.content
-                            if hasattr(content, "parts") and content.parts:
-                                for part in content.parts:
-                                    # Check for function calls
-                                    if hasattr(part, "function_call") and not is_processing_tool_call:
-                                        is_processing_tool_call = True
-                                        function_call = part.function_call
-
-                                        # Create tool call structure
-                                        tool_call_id = f"gemini_call_{len(self.current_stream_tool_calls)}"
-                                        current_tool_call = {
-                                            "id": tool_call_id,
-                                            "type": "function",
-                                            "function": {
-                                                "name": function_call.name,
-                                                "arguments": json.dumps(function_call.args)
-                                            }
-                                        }
-
-                                        # Add to tracking
-                                        self.current_stream_tool_calls.append(
-                                            current_tool_call)
-
-                                        # Emit tool call
-                                        yield {"type": "tool_calls", "tool_calls": [current_tool_call]}
-
-                                        # Execute the tool
-                                        try:
-                                            tool_name = function_call.name
-                                            tool_args = function_call.args
-
-                                            if tool_name in self.tools_map:
-                                                tool = self.tools_map[tool_name]
-                                                result = tool(**tool_args)
-
-                                                # Format result
-                                                tool_result = {
-                                                    "tool_call_id": tool_call_id,
-                                                    "function_name": tool_name,
-                                                    "result": result
-                                                }
-
-                                                # Add to tracking
-                                                self.current_stream_tool_results.append(
-                                                    tool_result)
-
-                                                # Emit tool result
-                                                yield {
-                                                    "type": "tool_result",
-                                                    "tool_call_id": tool_call_id,
-                                                    "content": json.dumps(result)
-                                                }
-
-                                                # Make follow-up call with the tool result
-                                                # Create tool result message
-                                                result_message = {
-                                                    "role": "user",
-                                                    "parts": [
-                                                        f"Tool {tool_name} returned: {json.dumps(result)}"
-                                                    ]
-                                                }
-
-                                                # Add to messages and make new stream request
-                                                follow_up_messages = formatted_messages.copy()
-                                                follow_up_messages.append({
-                                                    "role": "model",
-                                                    "parts": [{"text": "I need to use a tool."}, part]
-                                                })
-                                                follow_up_messages.append(
-                                                    result_message)
-
-                                                follow_up_stream = model.generate_content(
-                                                    follow_up_messages,
-                                                    tools=self.tools_schema,
-                                                    stream=True
-                                                )
-
-                                                # Process follow-up chunks
-                                                async for follow_chunk in follow_up_stream:
-                                                    if hasattr(follow_chunk, "text"):
-                                                        text = follow_chunk.text
-                                                        if text:
-                                                            self.current_stream_content += text
-                                                            yield {"content": text}
-                                            else:
-                                                error_msg = f"Tool {tool_name} not found"
-                                                yield {
-                                                    "type": "tool_result",
-                                                    "tool_call_id": tool_call_id,
-                                                    "content": json.dumps({"error": error_msg})
-                                                }
-                                        except Exception as e:
-                                            error_msg = f"Error executing tool: {str(e)}"
-                                            yield {
-                                                "type": "tool_result",
-                                                "tool_call_id": tool_call_id,
-                                                "content": json.dumps({"error": error_msg})
-                                            }
-
-                                        # Reset tool call tracking
-                                        is_processing_tool_call = False
-                                        current_tool_call = None
-
-                # Signal completion
-                yield {"finish_reason": "stop"}
-
-            except Exception as e:
-                # Handle any errors during streaming
-                error_msg = f"Streaming error: {str(e)}"
-                yield {"content": f"\nError during response generation: {error_msg}", "finish_reason": "error"}
+                    candidates = getattr(chunk, "candidates", None)
+                    if not candidates:
+                        continue
 
-        else:
-            # Fallback for unsupported providers
-            # Generate a non-streaming response
-            response = self.generate_response(messages, context)
+                    parts = getattr(getattr(candidates[0], "content", None), "parts", None)
+                    if not parts:
+                        continue
+
+                    for part in parts:
+                        # Check for function calls; each one runs as its own task so
+                        # independent tools execute concurrently with the stream
+                        if getattr(part, "function_call", None):
+                            # Unbounded: it buffers an answer while earlier text is still being sent
+                            follow_up_queue: asyncio.Queue = asyncio.Queue()
+                            follow_up_queues.append(follow_up_queue)
+                            follow_ups.create_task(self._handle_gemini_function_call(
+                                model, formatted_messages, part, queue, follow_up_queue,
+                                stream_state
+                            ))
+
+                # Forward the follow-up answers one after another
+                for follow_up_queue in follow_up_queues:
+                    async for text in _drain_queue(follow_up_queue):
+                        stream_state["content_parts"].append(text)
+                        await queue.put({"content": text})
+
+            # Signal completion once the primary and all follow-up streams are done
+            await queue.put({"finish_reason": "stop"})
+
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+        except Exception as e:
+            # Handle any errors during streaming, including failing to start it. Failures
+            # inside the task group arrive wrapped, so report the underlying cause
+            while isinstance(e, BaseExceptionGroup):
+                e = e.exceptions[0]
+            error_msg = f"Streaming error: {str(e)}"
+            await queue.put({"content": f"\nError during response generation: {error_msg}", "finish_reason": "error"})
+
+        finally:
+            # Always end the queue so the consumer (and its stream slot) is released;
+            # skipped on cancellation, in which case nobody is consuming anymore
+            if not cancelled:
+                await queue.put(_STREAM_END)
+
+    async def _handle_gemini_function_call(
+        self,
+        model: Any,
+        formatted_messages: List[Dict[str, Any]],
+        part: Any,
+        queue: asyncio.Queue,
+        follow_up_queue: asyncio.Queue,
+        stream_state: Dict[str, List[Any]],
+    ) -> None:
+        """
+        Execute a streamed Gemini function call and stream its follow-up answer
+
+        Tool events go straight to the shared queue; the follow-up text goes to the
+        call's own queue, which is always terminated by _STREAM_END.
+        """
+        try:
+            await self._run_gemini_function_call(
+                model, formatted_messages, part, queue, follow_up_queue, stream_state)
+        finally:
+            follow_up_queue.put_nowait(_STREAM_END)
+
+    async def _run_gemini_function_call(
+        self,
+        model: Any,
+        formatted_messages: List[Dict[str, Any]],
+        part: Any,
+        queue: asyncio.Queue,
+        follow_up_queue: asyncio.Queue,
+        stream_state: Dict[str, List[Any]],
+    ) -> None:
+        """Execute a streamed Gemini function call, then stream the follow-up answer"""
+        function_call = part.function_call
+
+        # Create tool call structure
+        tool_call_id = f"gemini_call_{len(stream_state['tool_calls'])}"
+        current_tool_call = {
+            "id": tool_call_id,
+            "type": "function",
+            "function": {
+                "name": function_call.name,
+                "arguments": _dumps(function_call.args)
+            }
+        }
+
+        # Add to tracking
+        stream_state["tool_calls"].append(current_tool_call)
+
+        # Emit tool call
+        await queue.put({"type": "tool_calls", "tool_calls": [current_tool_call]})
+
+        # Execute the tool
+        try:
+            tool_name = function_call.name
+            tool_args = function_call.args
+
+            if tool_name in self.tools_map:
+                tool = self.tools_map[tool_name]
+                result = await self._invoke_tool(tool, **tool_args)
+
+                # Format result
+                tool_result = {
+                    "tool_call_id": tool_call_id,
+                    "function_name": tool_name,
+                    "result": result
+                }
+
+                # Add to tracking
+                stream_state["tool_results"].append(tool_result)
+
+                # Serialize the result once for both the client and the follow-up request
+                result_json = _dumps(result)
+
+                # Emit tool result
+                await queue.put({
+                    "type": "tool_result",
+                    "tool_call_id": tool_call_id,
+                    "content": result_json
+                })
+
+                # Make follow-up call with the tool result
+                # Create tool result message
+                result_message = {
+                    "role": "user",
+                    "parts": [
+                        f"Tool {tool_name} returned: {result_json}"
+                    ]
+                }
+
+                # Extend the history in a single tuple build and make new stream request
+                follow_up_messages = (
+                    *formatted_messages,
+                    {
+                        "role": "model",
+                        "parts": [{"text": "I need to use a tool."}, part]
+                    },
+                    result_message,
+                )
+
+            else:
+                error_msg = f"Tool {tool_name} not found"
+                await queue.put({
+                    "type": "tool_result",
+                    "tool_call_id": tool_call_id,
+                    "content": _dumps({"error": error_msg})
+                })
+                return
+        except Exception as e:
+            error_msg = f"Error executing tool: {str(e)}"
+            await queue.put({
+                "type": "tool_result",
+                "tool_call_id": tool_call_id,
+                "content": _dumps({"error": error_msg})
+            })
+            return
+
+        # Make a follow-up call with the tool result; stream errors end the whole response
+        await self._pump_gemini_follow_up(model, follow_up_messages, follow_up_queue)
+
+    async def _pump_gemini_follow_up(
+        self,
+        model: Any,
+        follow_up_messages: Sequence[Dict[str, Any]],
+        follow_up_queue: asyncio.Queue,
+    ) -> None:
+        """Stream a Gemini follow-up response's text into the call's follow-up queue"""
+        follow_up_stream = await model.generate_content_async(
+            follow_up_messages,
+            stream=True,
+            tools=self.tools_schema,
+        )
 
-            # Yield the entire content
-            yield {"content": response["final_content"]}
+        # Process follow-up chunks
+        async for follow_chunk in follow_up_stream:
+            text = _gemini_text(follow_chunk)
+            if text:
+                follow_up_queue.put_nowait(text)
 
-            # Store for database
-            self.current_stream_content = response["final_content"]
+    async def get_final_streaming_content(self, stream_state: Dict[str, List[Any]]) -> str:
+        """Get the complete content accumulated in a stream's state"""
+        return "".join(stream_state["content_parts"])
 
-            # Collect tool calls and results
-            for turn in response["conversation_turns"]:
-                if turn.get("tool_calls"):
-                    self.current_stream_tool_calls.extend(turn["tool_calls"])
 
-                if turn.get("tool_results"):
-                    self.current_stream_tool_results.extend(
-                        turn["tool_results"])
+async def close_http_clients() -> None:
+    """Close the shared HTTP connection pool (call on application shutdown)"""
+    await _ASYNC_HTTP_CLIENT.aclose()
 
-            # Signal completion
-            yield {"finish_reason": "stop"}
 
-    async def get_final_streaming_content(self) -> str:
-        """Get the complete content accumulated during streaming"""
-        return self.current_stream_content
+@lru_cache(maxsize=None)
+def get_llm_service() -> LLMService:
+    """Get the process-wide LLM service instance"""
+    return LLMService()
 
 
 # Singleton pattern
-llm_service = LLMService()
+llm_service = get_llm_service()
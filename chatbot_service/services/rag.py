@@ -1,4 +1,5 @@
 from typing import List, Dict, Any, Optional
+import asyncio
 from sqlalchemy.orm import Session
 from models.knowledge_base import DocumentChunk, Document
 
@@ -6,6 +7,11 @@ from repositories.knowledge_base import DocumentChunkRepository
 from services.embeddings import embedding_service
 from core.config import settings
 
+# Characters after which a chunk may be split
+SENTENCE_BOUNDARIES = (".", "!", "?", "\n")
+
+EMBEDDING_BATCH_SIZE = 64  # Number of chunks embedded and inserted per batch when indexing
+
 
 class RAGService:
     """Service for Retrieval-Augmented Generation (RAG)"""
@@ -26,24 +32,29 @@ class RAGService:
         # Simple chunking by character count with overlap
         chunks = []
         start = 0
+        text_length = len(document_text)
 
-        while start < len(document_text):
+        while start < text_length:
             # Get chunk of approximately chunk_size
-            end = min(start + chunk_size, len(document_text))
+            end = min(start + chunk_size, text_length)
 
             # If not at the end of the document, try to find a good splitting point
-            if end < len(document_text):
-                # Look for the last period, question mark, or exclamation within the last 100 chars of the chunk
-                for i in range(end, max(end - 100, start), -1):
-                    if document_text[i-1] in ['.', '!', '?', '\n']:
-                        end = i
-                        break
+            if end < text_length:
+                # Look for the last period, question mark, exclamation or newline within the last 100 chars of the chunk
+                window_start = max(end - 100, start)
+                split = max(document_text.rfind(boundary, window_start, end)
+                            for boundary in SENTENCE_BOUNDARIES)
+                if split != -1:
+                    end = split + 1
 
             # Add the chunk
             chunks.append(document_text[start:end])
 
-            # Move to next chunk with overlap
-            start = end - overlap
+            if end == text_length:
+                break
+
+            # Move to next chunk with overlap, always making progress
+            start = max(end - overlap, start + 1)
 
         return chunks
 
@@ -64,17 +75,17 @@ class RAGService:
         # chunks = RAGService.chunk_document(document_text)
         chunks = [document_text]
 
-        # Create embeddings for all chunks
-        embeddings = embedding_service.create_embeddings(chunks)
+        # Embed and store the chunks in batches to bound memory and insert round-trips
+        for start in range(0, len(chunks), EMBEDDING_BATCH_SIZE):
+            batch = chunks[start:start + EMBEDDING_BATCH_SIZE]
+            embeddings = embedding_service.create_embeddings(batch)
 
-        # Store chunks with embeddings
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            DocumentChunkRepository.create_chunk(
+            DocumentChunkRepository.create_chunks(
                 db=db,
                 document_id=document_id,
-                content=chunk,
-                chunk_number=i,
-                embedding=embedding
+                contents=batch,
+                embeddings=embeddings,
+                first_chunk_number=start
             )
 
     @staticmethod
@@ -90,30 +101,47 @@ class RAGService:
         Returns:
             dict: Contains context and optionally document sources
         """
-        # Create embedding for the query
-        query_embedding = embedding_service.create_embedding(query)
+        # Create embedding for the query (repeated queries are served from cache)
+        query_embedding = embedding_service.create_query_embedding(query)
 
-        # Search for similar chunks
-        chunks = DocumentChunkRepository.search_similar_chunks(
-            db=db,
-            query_embedding=query_embedding,
-            limit=settings.MAX_RELEVANT_CHUNKS
-        )
+        # If sources are requested, fetch the parent documents in the same query
+        if include_sources:
+            rows = DocumentChunkRepository.search_similar_chunks_with_documents(
+                db=db,
+                query_embedding=query_embedding,
+                limit=settings.MAX_RELEVANT_CHUNKS
+            )
+            chunks = rows
+            # Unique parent documents (rows exposing id, title and source), in order
+            # of their best matching chunk
+            documents = list({row.id: row for row in rows}.values())
+        else:
+            chunks = DocumentChunkRepository.search_similar_chunks(
+                db=db,
+                query_embedding=query_embedding,
+                limit=settings.MAX_RELEVANT_CHUNKS
+            )
 
         # Compile context from chunks
-        context = "\n\n".join([chunk.content for chunk in chunks])
+        context = "\n\n".join(chunk.content for chunk in chunks)
 
         result = {"context": context}
 
-        # If sources are requested, include the parent documents
         if include_sources:
-            # Get unique parent documents for the chunks
-            doc_ids = set(chunk.document_id for chunk in chunks)
-            documents = db.query(Document).filter(
-                Document.id.in_(doc_ids)).all()
             result["documents"] = documents
 
         return result
 
+    @staticmethod
+    async def aretrieve_relevant_context(db: Session, query: str, include_sources=False):
+        """
+        Async variant of retrieve_relevant_context for use from async handlers.
+
+        The embedding call and the database queries block, so they run in a worker
+        thread (together, so the session is only used from one thread at a time).
+        """
+        return await asyncio.to_thread(
+            RAGService.retrieve_relevant_context, db, query, include_sources)
+
 
 rag_service = RAGService()
@@ -1,8 +1,13 @@
-from core.database import get_db
+from core.database import SessionLocal
 from services.rag import RAGService
+from utils.cache import TTLCache, normalize_query
 from utils.format_sources import format_document_source
 
-db = next(get_db())
+RESULT_CACHE_SIZE = 1024  # Maximum number of retrieval results kept in memory
+RESULT_CACHE_TTL = 600  # Seconds a cached retrieval result stays valid
+
+# Retrieval results keyed by normalized query
+_result_cache = TTLCache(RESULT_CACHE_SIZE, RESULT_CACHE_TTL)
 
 
 def get_information(query: str):
@@ -15,17 +20,33 @@ def get_information(query: str):
     Return:
         Dictionary containing the relevant context to the query and formatted sources.
     """
-    # Get relevant documents and their chunks
-    result = RAGService.retrieve_relevant_context(
-        db, query, include_sources=True)
-
-    # If we have document sources, format them according to AI SDK requirements
-    formatted_sources = []
-    if "documents" in result and result["documents"]:
-        for doc in result["documents"]:
-            formatted_sources.append(format_document_source(doc))
-
-    return {
-        "context": result["context"] if "context" in result else "",
+    # Queries differing only in case or whitespace share a cached result
+    key = normalize_query(query)
+    cached = _result_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # Use a pooled session scoped to this call; concurrent tool calls run in
+    # separate threads and must not share one
+    with SessionLocal() as db:
+        # Get relevant documents and their chunks
+        result = RAGService.retrieve_relevant_context(
+            db, query, include_sources=True)
+
+        # If we have document sources, format them according to AI SDK requirements
+        formatted_sources = [
+            format_document_source(doc) for doc in result.get("documents") or ()
+        ]
+
+    information = {
+        "context": result.get("context", ""),
         "sources": formatted_sources
     }
+
+    _result_cache.set(key, information)
+    return information
+
+
+def clear_result_cache() -> None:
+    """Drop all cached retrieval results (call after the knowledge base changes)"""
+    _result_cache.clear()
@@ -1,6 +1,7 @@
 from utils.logger import setup_logger
 from utils.function_to_schema import function_to_schema
 from utils.format_sources import format_document_source
+from utils.cache import TTLCache, normalize_query
 
 # Export utils
-__all__ = ["setup_logger", "function_to_schema", "format_document_source"]
+__all__ = ["setup_logger", "function_to_schema", "format_document_source", "TTLCache", "normalize_query"]
@@ -0,0 +1,58 @@
+from typing import Any, Hashable, Optional
+from collections import OrderedDict
+import threading
+import time
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query for use as a cache key, ignoring case and whitespace differences"""
+    return " ".join(query.lower().split())
+
+
+class TTLCache:
+    """
+    Small thread-safe LRU cache whose entries optionally expire
+
+    Args:
+        maxsize: Maximum number of entries kept; the least recently used entry is
+            evicted first (0 disables the cache)
+        ttl: Seconds an entry stays valid, or None to keep entries until evicted
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Values keyed by cache key, with the time they were stored
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if it is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at >= self.ttl:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entries beyond maxsize"""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached values"""
+        with self._lock:
+            self._entries.clear()
@@ -1,9 +1,13 @@
+# URL schemes that make a document source usable as a link
+URL_PREFIXES = ("http://", "https://")
+
+
 def format_document_source(document):
     """
-    Convert a Document model instance to the AI SDK source format.
+    Convert a document to the AI SDK source format.
 
     Args:
-        document: Document model instance
+        document: Document model instance or row with id, title and source
 
     Returns:
         str: Formatted source string
@@ -16,7 +20,8 @@ def format_document_source(document):
     }
 
     # Add URL if source contains a URL
-    if document.source and (document.source.startswith("http://") or document.source.startswith("https://")):
-        source_data["url"] = document.source
+    source = document.source
+    if source and source.startswith(URL_PREFIXES):
+        source_data["url"] = source
 
     return source_data
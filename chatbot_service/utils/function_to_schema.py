@@ -1,16 +1,25 @@
+import copy
 import inspect
+from functools import lru_cache
+from types import MappingProxyType
+
+# Python annotation -> JSON schema type
+_TYPE_MAP = MappingProxyType({
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    dict: "object",
+    type(None): "null",
+})
 
 def function_to_schema(func) -> dict:
-    type_map = {
-        str: "string",
-        int: "integer",
-        float: "number",
-        bool: "boolean",
-        list: "array",
-        dict: "object",
-        type(None): "null",
-    }
+    """Build the tool schema for a function. Callers get their own copy of the cached schema."""
+    return copy.deepcopy(_build_schema(func))
 
+@lru_cache(maxsize=256)
+def _build_schema(func) -> dict:
     try:
         signature = inspect.signature(func)
     except ValueError as e:
@@ -19,20 +28,11 @@ def function_to_schema(func) -> dict:
         )
 
     parameters = {}
-    for param in signature.parameters.values():
-        try:
-            param_type = type_map.get(param.annotation, "string")
-        except KeyError as e:
-            raise KeyError(
-                f"Unknown type annotation {param.annotation} for parameter {param.name}: {str(e)}"
-            )
-        parameters[param.name] = {"type": param_type}
-
-    required = [
-        param.name
-        for param in signature.parameters.values()
-        if param.default == inspect._empty
-    ]
+    required = []
+    for name, param in signature.parameters.items():
+        parameters[name] = {"type": _TYPE_MAP.get(param.annotation, "string")}
+        if param.default is inspect.Parameter.empty:
+            required.append(name)
 
     return {
         "type": "function",
@@ -1,49 +1,80 @@
 import logging
 import os
+import queue
 import sys
-from logging.handlers import RotatingFileHandler
+from typing import Dict, List
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Shared formatters, built once
+_CONSOLE_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_FILE_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
+
+LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
+
+# Loggers already configured by setup_logger, keyed by name
+_LOGGERS: Dict[str, logging.Logger] = {}
+_log_dir_created = False
+
+# Background listeners doing the actual console/file writes
+_LISTENERS: List[QueueListener] = []
 
 def setup_logger(name: str, log_level: str = "INFO") -> logging.Logger:
     """
-    Set up logger with console and file handlers
-    
+    Set up logger with console and file handlers.
+    Records are handed to a queue and written by a background listener thread,
+    so logging never blocks the event loop on stream/file I/O.
+    Repeated calls with the same name return the already configured logger.
+
     Args:
         name: Name of the logger
         log_level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        
+
     Returns:
         Configured logger
     """
+    global _log_dir_created
+
+    if name in _LOGGERS:
+        return _LOGGERS[name]
+
     # Create logger
     logger = logging.getLogger(name)
-    
+
     # Set log level
     level = getattr(logging, log_level.upper(), logging.INFO)
     logger.setLevel(level)
-    
-    # Create formatters
-    console_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-    file_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s')
-    
+
     # Create console handler
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(console_formatter)
+    console_handler.setFormatter(_CONSOLE_FORMATTER)
     console_handler.setLevel(level)
-    
+
     # Create file handler
-    log_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
-    os.makedirs(log_dir, exist_ok=True)
-    
+    if not _log_dir_created:
+        os.makedirs(LOG_DIR, exist_ok=True)
+        _log_dir_created = True
+
     file_handler = RotatingFileHandler(
-        os.path.join(log_dir, f"{name}.log"),
+        os.path.join(LOG_DIR, f"{name}.log"),
         maxBytes=10485760,  # 10MB
         backupCount=5
     )
-    file_handler.setFormatter(file_formatter)
+    file_handler.setFormatter(_FILE_FORMATTER)
     file_handler.setLevel(level)
-    
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
-    
-    return logger
\ No newline at end of file
+
+    # Add queue handler to logger; the listener forwards records to the real handlers
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    _LISTENERS.append(listener)
+
+    _LOGGERS[name] = logger
+    return logger
+
+
+def stop_log_listeners() -> None:
+    """Flush queued records and stop all background log listeners"""
+    while _LISTENERS:
+        _LISTENERS.pop().stop()